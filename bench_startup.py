@@ -0,0 +1,143 @@
+"""Benchmark the imports made by the game before its first prompt and the time until it shows.
+
+use: python bench_startup.py [--rooms N | --world FILE] [--runs N] [--record FILE]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROMPT = b"Make your choice"
+
+
+def make_world(rooms, items_per_room=2):
+    """Generate a world as a dict, a ring of rooms each holding a few items."""
+    def room(n):
+        return {
+            "name": f"Room {n}",
+            "description": f"Room number {n} of the generated manor, it has dusty corners.",
+            "rooms": {"east": f"r{(n + 1) % rooms}", "west": f"r{(n - 1) % rooms}"},
+            "items": [{
+                "name": f"potion {n}-{i}",
+                "description": "A small bottle, the label has worn off.",
+                "effects": [{"type": "blind", "timeout": 1}]
+            } for i in range(items_per_room)]
+        }
+
+    return {
+        "rooms": {f"r{n}": room(n) for n in range(rooms)},
+        "basehp": 100,
+        "opening": "Welcome to the generated manor",
+        "start_room": "r0"
+    }
+
+
+def start_game(*args, options=()):
+    """Start the game and wait for its first prompt, get (seconds taken, stderr until then)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, *options, "game.py", *args], cwd=HERE,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out = b""
+    try:
+        while PROMPT not in out:
+            chunk = proc.stdout.read1(4096)
+            if not chunk:
+                break
+            out += chunk
+        seconds = time.perf_counter() - start
+    finally:
+        proc.kill()
+        err = proc.stderr.read().decode()
+        proc.wait()
+    if PROMPT not in out:
+        raise RuntimeError("The game exited before showing a prompt\n" + err)
+    return seconds, err
+
+
+def import_times(*args):
+    """Run the game with `-X importtime` until its first prompt, get a dict of name -> (self us, cumulative us).
+
+    This covers everything imported by `game.py` as `__main__`, including modules loaded lazily before the prompt.
+    """
+    _, err = start_game(*args, options=["-X", "importtime"])
+    times = {}
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative))
+    return times
+
+
+def first_prompt(*args):
+    """Start the game, get the seconds taken until it shows its first prompt."""
+    return start_game(*args)[0]
+
+
+def interpreter_startup():
+    """Get the seconds taken to start and stop a bare interpreter."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - start
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, universal_newlines=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--world", help="world JSON to start, defaults to game.json")
+    parser.add_argument("--rooms", type=int, help="start a generated world with this many rooms instead")
+    parser.add_argument("--runs", type=int, default=5, help="number of runs to take the median of")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports to show")
+    parser.add_argument("--record", help="append the results as a JSON line to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world = args.world
+        if args.rooms is not None:
+            world = os.path.join(tmp, "world.json")
+            with open(world, "w") as fp:
+                json.dump(make_world(args.rooms), fp)
+        game_args = [] if world is None else [os.path.abspath(world)]
+
+        imports = [import_times(*game_args) for _ in range(args.runs)]
+        prompts = [first_prompt(*game_args) for _ in range(args.runs)]
+        bare = [interpreter_startup() for _ in range(args.runs)]
+
+    import_us = statistics.median(sum(self_us for self_us, _ in i.values()) for i in imports)
+    prompt_ms = statistics.median(prompts) * 1000
+    bare_ms = statistics.median(bare) * 1000
+
+    print(f"imports before first prompt: {import_us / 1000:.2f}ms")
+    slowest = sorted(imports[-1].items(), key=lambda i: i[1][0], reverse=True)[:args.top]
+    for name, (self_us, cumulative) in slowest:
+        print(f"\t{name:<32} self {self_us / 1000:7.2f}ms  cumulative {cumulative / 1000:7.2f}ms")
+    print(f"time to first prompt: {prompt_ms:.1f}ms (bare interpreter {bare_ms:.1f}ms)")
+
+    if args.record:
+        result = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "world": args.world,
+            "rooms": args.rooms,
+            "import_ms": round(import_us / 1000, 3),
+            "first_prompt_ms": round(prompt_ms, 3),
+            "bare_interpreter_ms": round(bare_ms, 3)
+        }
+        with open(args.record, "a") as fp:
+            fp.write(json.dumps(result) + "\n")
+
+
+if __name__ == '__main__':
+    main()
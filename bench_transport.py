@@ -0,0 +1,60 @@
+"""Benchmark the bytes and CPU time per command of the network transports.
+
+use: python bench_transport.py [--commands N] [world.json]
+
+Server and clients run in one process over loopback, so CPU times include the client.
+"""
+import argparse
+import asyncio
+import time
+
+from client import CLIENTS
+from game import load_world
+from server import serve
+
+COMMANDS = ["help", "move east", "list", "move west", "search potion"]
+
+
+async def run(world, protocol, compress, commands):
+    """Play commands over a loopback connection, get (wire bytes, text bytes, CPU seconds, seconds)."""
+    server = await serve(world, port=0, protocol=protocol, compress=compress)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        client = await CLIENTS[protocol].connect("127.0.0.1", port, compress=compress)
+        await client.read_prompt()
+        received, text = client.received_bytes, client.text_bytes
+
+        cpu, wall = time.process_time(), time.perf_counter()
+        for i in range(commands):
+            await client.command(COMMANDS[i % len(COMMANDS)])
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+
+        await client.close()
+        await asyncio.sleep(0.1)  # let the game see the client leave
+        return client.received_bytes - received, client.text_bytes - text, cpu, wall
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("world", nargs="?", default="game.json")
+    parser.add_argument("--commands", type=int, default=2000)
+    args = parser.parse_args()
+
+    world = load_world(args.world)
+    await world.load()
+
+    print(f"{'protocol':<10} {'compress':<9} {'bytes/cmd':>10} {'text/cmd':>9} {'ratio':>6}"
+          f" {'cpu us/cmd':>11} {'wall us/cmd':>12}")
+    for protocol in CLIENTS:
+        for compress in (False, True):
+            sent, text, cpu, wall = await run(world, protocol, compress, args.commands)
+            n = args.commands
+            print(f"{protocol:<10} {str(compress):<9} {sent / n:>10.1f} {text / n:>9.1f} {text / sent:>6.2f}"
+                  f" {cpu / n * 1e6:>11.1f} {wall / n * 1e6:>12.1f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,193 @@
+"""Clients for playing games over the network, used by the benchmarks and load tests."""
+import asyncio
+import base64
+import os
+import struct
+import zlib
+
+from commands import BaseCommands
+from game import PROMPT, Game
+from network import COMPRESS2, DO, DONT, IAC, OP_CLOSE, SB, SE, WILL, WS_DEFLATE_TAIL
+from transport import QueueTransport
+
+
+class Client:
+    """Base class for a client playing a game over a connection."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.text = ""  # text received and not read yet
+        self.received_bytes = 0  # bytes received on the connection
+        self.text_bytes = 0  # bytes of text after decompression
+
+    async def receive(self):
+        """Receive some text, raise EOFError if the connection closes."""
+        raise NotImplementedError
+
+    def send(self, line):
+        raise NotImplementedError
+
+    async def read_prompt(self):
+        """Read text up to and including the next prompt."""
+        while PROMPT not in self.text:
+            self.text += await self.receive()
+        end = self.text.index(PROMPT) + len(PROMPT)
+        text, self.text = self.text[:end], self.text[end:]
+        return text
+
+    async def command(self, line):
+        """Send a command and read the output up to the next prompt."""
+        self.send(line)
+        return await self.read_prompt()
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+class TelnetClient(Client):
+
+    def __init__(self, reader, writer, compress):
+        super().__init__(reader, writer)
+        self.compress = compress
+        self.decompressor = None
+
+    @classmethod
+    async def connect(cls, host, port, *, compress=True):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, compress)
+
+    async def receive(self):
+        data = await self.reader.read(65536)
+        if not data:
+            raise EOFError
+        self.received_bytes += len(data)
+        if self.decompressor is not None:
+            data = self.decompressor.decompress(data)
+
+        will = bytes([IAC, WILL, COMPRESS2])
+        if will in data:
+            data = data.replace(will, b"")
+            self.writer.write(bytes([IAC, DO if self.compress else DONT, COMPRESS2]))
+        start = bytes([IAC, SB, COMPRESS2, IAC, SE])
+        if start in data:
+            data, compressed = data.split(start, 1)
+            self.decompressor = zlib.decompressobj()
+            data += self.decompressor.decompress(compressed)
+
+        data = data.replace(b"\xff\xff", b"\xff").replace(b"\r\n", b"\n")
+        self.text_bytes += len(data)
+        return data.decode(errors="replace")
+
+    def send(self, line):
+        self.writer.write(line.encode() + b"\r\n")
+
+
+class WebSocketClient(Client):
+
+    def __init__(self, reader, writer, deflate):
+        super().__init__(reader, writer)
+        self.decompressor = zlib.decompressobj(-15) if deflate else None
+
+    @classmethod
+    async def connect(cls, host, port, *, compress=True):
+        reader, writer = await asyncio.open_connection(host, port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        request = [
+            "GET / HTTP/1.1",
+            f"Host: {host}:{port}",
+            "Upgrade: websocket",
+            "Connection: Upgrade",
+            f"Sec-WebSocket-Key: {key}",
+            "Sec-WebSocket-Version: 13"
+        ]
+        if compress:
+            request.append("Sec-WebSocket-Extensions: permessage-deflate; client_max_window_bits")
+        writer.write(("\r\n".join(request) + "\r\n\r\n").encode())
+        response = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        if " 101 " not in response.split("\r\n")[0]:
+            raise ConnectionError(response)
+        client = cls(reader, writer, "permessage-deflate" in response)
+        client.received_bytes = len(response)
+        return client
+
+    async def receive(self):
+        while True:
+            try:
+                first, second = await self.reader.readexactly(2)
+                length = second & 0x7F
+                header = 2
+                if length == 126:
+                    length, = struct.unpack("!H", await self.reader.readexactly(2))
+                    header += 2
+                elif length == 127:
+                    length, = struct.unpack("!Q", await self.reader.readexactly(8))
+                    header += 8
+                payload = await self.reader.readexactly(length)
+            except asyncio.IncompleteReadError:
+                raise EOFError
+            self.received_bytes += header + length
+            if first & 0x0F == OP_CLOSE:
+                raise EOFError
+            if not first & 0x08:  # pings and pongs are not game text
+                break
+        if first & 0x40:
+            payload = self.decompressor.decompress(payload + WS_DEFLATE_TAIL)
+        self.text_bytes += len(payload)
+        return payload.decode(errors="replace")
+
+    def send(self, line):
+        payload = line.encode()
+        mask = os.urandom(4)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x81, 0x80 | length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x81, 0x80 | 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x81, 0x80 | 127, length)
+        self.writer.write(header + mask + masked)
+
+
+class LocalClient(Client):
+    """Client playing a game in this process, without a connection."""
+
+    def __init__(self, world):
+        super().__init__(None, None)
+        self.transport = QueueTransport()
+        self.game = Game(world, transport=self.transport)
+        self.game.add_cog(BaseCommands(self.game))
+        self.task = asyncio.ensure_future(self.play())
+
+    async def play(self):
+        try:
+            await self.game.game_loop()
+        finally:
+            await self.transport.close()
+
+    @classmethod
+    async def connect(cls, world):
+        return cls(world)
+
+    async def receive(self):
+        text = await self.transport.writes.get()
+        if text is None:
+            raise EOFError
+        self.received_bytes += len(text)
+        self.text_bytes += len(text)
+        return text
+
+    def send(self, line):
+        self.transport.lines.put_nowait(line)
+
+    async def close(self):
+        self.transport.lines.put_nowait(None)
+        await self.task
+
+
+CLIENTS = {
+    "telnet": TelnetClient,
+    "websocket": WebSocketClient
+}
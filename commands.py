@@ -1,6 +1,4 @@
-import inspect
-
-from shared import CommandException, utils_get
+from shared import CommandException, and_comma_list, utils_get
 
 
 class Command:
@@ -12,10 +10,21 @@ class Command:
         doc = "" if func.__doc__ is None else func.__doc__
         self.desc = doc.split("\n")[0]
         self.parent = None
+        code = func.__code__
+        self.max_args = code.co_argcount - 1  # not counting the cog
+        self.min_args = self.max_args - len(func.__defaults__ or ())
+
+    def bind(self, parent):
+        """Create a copy of this command that is invoked on parent."""
+        command = type(self)(self.func)
+        command.parent = parent
+        return command
 
     async def invoke(self, *args):
+        if not self.min_args <= len(args) <= self.max_args:
+            raise CommandException("Wrong arguments for {0.name}. {0.desc}".format(self))
         res = self.func(self.parent, *args)
-        if inspect.isawaitable(res):
+        if hasattr(res, "__await__"):
             await res
 
 
@@ -43,6 +52,7 @@ class BaseCommands:
             raise CommandException("This item does not exist")
         item.apply(self.player)
         self.items.remove(item)
+        self.game.index.remove_item(item)
 
     @Command
     def collect(self, item):
@@ -51,7 +61,8 @@ class BaseCommands:
         if item is None:
             raise CommandException("This item does not exist")
         self.player.add_item(item)
-        self.game.current_room.items.remove(item)
+        self.game.own_room(self.game.current_room_key).items.remove(item)
+        self.game.index.move_item(item, self.player)
 
     @Command
     def list(self):
@@ -62,10 +73,40 @@ class BaseCommands:
         for i in self.items:
             self.game.player_msg(f"\t{i}")
 
+    @Command
+    async def search(self, query):
+        """Search rooms and items. use: search <words>."""
+        await self.game.world.load()
+        found = self.game.index.search(query)
+        if not found:
+            raise CommandException("Nothing matches your search")
+        rooms = sorted(self.game.rooms[i].name for i in found if isinstance(i, str))
+        items = sorted(i.name for i in found if not isinstance(i, str))
+        if rooms:
+            self.game.player_msg("Rooms: {}".format(and_comma_list(*rooms)))
+        if items:
+            self.game.player_msg("Items: {}".format(and_comma_list(*items)))
+
+    @Command
+    def macro(self, definition=""):
+        """Define a macro. use: macro <name> <command>; <command>...
+
+        The rest of the line is the body of the macro, also when macro comes after other commands.
+        """
+        name, *body = definition.split(None, 1) or [None]
+        if not body:
+            raise CommandException("A macro needs at least one command")
+        if name in self.game.commands:
+            raise CommandException("There is already a command with this name")
+        self.game.macros[name] = self.game.parse_pipeline(body[0])
+        self.game.player_msg(f"Defined the macro {name}")
+
     @Command
     def help(self):
         """Display the help."""
         format_str = "{0.name}: {0.desc}"
-        print("Commands:")
+        self.game.player_msg("Commands:")
         for i in self.game.commands.values():
-            print(format_str.format(i))
+            self.game.player_msg(format_str.format(i))
+        if self.game.macros:
+            self.game.player_msg("Macros: {}".format(and_comma_list(*self.game.macros)))
@@ -1,97 +1,150 @@
 import asyncio
-import inspect
-import json
 import sys
+from collections import ChainMap
 from commands import BaseCommands, Command
-from concurrent import futures
 
 from player import Player
-from room import Room
 from shared import CommandException, Status
+from transport import StdioTransport
+from world import World
 
-async def ainput(prompt=None, *, loop=None, event=None):
-    """Get input from prompt asynchronously."""
-    loop = asyncio.get_event_loop() if loop is None else loop
-    line = '' if prompt is None else prompt
-
-    print(line, end="")
-
-    tasks = [loop.run_in_executor(None, sys.stdin.readline)]
-    if event is not None:
-        tasks.append(event.wait())
-
-    results, _ = await asyncio.wait(tasks, return_when=futures.FIRST_COMPLETED)
-    result = [i.result() for i in results][0]
-    if isinstance(result, str):
-        return result.strip(" \n\r")
-
+PROMPT = "Make your choice\n>  "
 
 class Game:
     """Class for game events and controlling."""
 
     __slots__ = [
+        "world",
         "rooms",
         "opening",
         "loop",
+        "transport",
         "player",
         "start_room",
         "current_room",
-        "running_event"
+        "current_room_key",
+        "running_event",
+        "index",
+        "commands",
+        "macros",
+        "output",
+        "flush_handle"
     ]
 
-    commands = {}
-
-    def __init__(self, *, rooms, opening, start_room, basehp=100, loop=None):
-        self.rooms = rooms
-        self.opening = opening
+    def __init__(self, world, *, transport=None, loop=None):
+        self.world = world
+        self.rooms = ChainMap({}, world.rooms)  # rooms changed in this game shadow the shared ones
+        self.opening = world.opening
         self.loop = asyncio.get_event_loop() if loop is None else loop
-        self.player = Player(basehp, self, self.loop)
-        self.start_room = start_room
+        self.transport = StdioTransport() if transport is None else transport
+        self.player = Player(world.basehp, self, self.loop)
+        self.start_room = world.start_room
 
         self.current_room = None
+        self.current_room_key = None
         self.running_event = asyncio.Event()
+        self.index = world.index.overlay()
+        self.commands = {}
+        self.macros = {}  # macro name -> list of parsed (command, args)
+        self.output = []  # messages waiting to be written
+        self.flush_handle = None
 
     def finish(self, reason):
         """End game, quit event loop."""
         self.running_event.set()
         self.player_msg(reason)
 
+    def parse_pipeline(self, string):
+        """Parse commands separated by `;` into (command, args) pairs, expanding macros.
+
+        `macro` takes the rest of the line as its body wherever it appears, the body is a pipeline itself.
+        """
+        steps = []
+        rest = string
+        while rest:
+            part, sep, rest = rest.partition(";")
+            cmd, *args = part.split(None, 1) or [None]  # split first word off
+            if cmd is None:
+                continue
+            if cmd == "macro":
+                args = (part + sep + rest).strip().split(None, 1)[1:]
+                rest = ""
+            else:
+                args = [i.strip() for i in args]
+            macro = self.macros.get(cmd)
+            if macro is not None:
+                steps.extend(macro)
+                continue
+            func = self.commands.get(cmd)
+            if func is None:
+                raise CommandException("Command not found")
+            steps.append((func, args))
+        return steps
+
+    async def run_pipeline(self, steps):
+        """Run parsed commands back to back, stopping at the first that fails."""
+        for func, args in steps:
+            if self.running_event.is_set():
+                break
+            await func.invoke(*args)
+
     async def parse_command(self, string):
-        """Parse a game command."""
-        cmd, *rest = string.split(None, 1)  # split first word off
-        func = self.commands.get(cmd)
-        if func is None:
-            raise CommandException("Command not found")
-        await func.invoke(*rest)
+        """Parse and run a game command or pipeline of commands."""
+        await self.run_pipeline(self.parse_pipeline(string))
 
     @classmethod
-    def from_dict(cls, dic, *args, **kwargs):
-        """Helper function to generate a game from a JSON file."""
-        rooms = cls.gen_rooms(dic.pop("rooms", []))
-        return cls(*args, rooms=rooms, **{**dic, **kwargs})
-
-    @staticmethod
-    def gen_rooms(rooms):
-        """Helper function to generate rooms from a JSON file."""
-        globaldict = {}
-        for k, v in rooms.items():
-            room = Room.from_dict(v)
-            globaldict[k] = room
-            room.global_rooms = globaldict
-        return globaldict
-
-    @staticmethod
-    def player_msg(msg):
-        print(msg)
+    def from_dict(cls, dic, *, loop=None, **kwargs):
+        """Helper function to generate a game in a world of its own from a JSON file."""
+        return cls(World.from_dict({**dic, **kwargs}), loop=loop)
+
+    def player_msg(self, msg):
+        """Queue a message for the player, all messages queued in one loop turn are written together."""
+        self.output.append(str(msg))
+        if self.flush_handle is None:
+            self.flush_handle = self.loop.call_soon(self.flush)
+
+    def flush(self, prompt=""):
+        """Write all queued messages, followed by prompt, at once."""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        if self.output:
+            prompt = "\n".join(self.output) + "\n" + prompt
+            self.output.clear()
+        if prompt:
+            self.transport.write(prompt)
+
+    async def read_command(self):
+        """Wait for the next line from the player, None if they leave or the game ends."""
+        tasks = [
+            asyncio.ensure_future(self.transport.readline(), loop=self.loop),
+            asyncio.ensure_future(self.running_event.wait(), loop=self.loop)
+        ]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for i in pending:
+            i.cancel()
+        line = tasks[0].result() if tasks[0] in done else None
+        if line is not None:
+            return line.strip(" \n\r")
 
     def to_dict(self):
+        self.world.load_now()
         return {
             "rooms": {k: v.to_dict() for k, v in self.rooms.items()},
-            "basehp": self.basehp,
+            "basehp": self.world.basehp,
             "opening": self.opening,
             "start_room": self.start_room
         }
 
+    def own_room(self, key):
+        """Get a room private to this game, copying the shared room before its first change."""
+        room = self.rooms.maps[0].get(key)
+        if room is None:
+            room = self.rooms[key] = self.world.rooms[key].copy()
+            if key == self.current_room_key:
+                self.current_room = room
+        return room
+
     def use_item(self, item):
         """Apply an items effects."""
         for k, v in item.effects:
@@ -102,45 +155,71 @@ class Game:
         if Status.slow in self.player.status:
             raise CommandException("You are still locked inside this room.")
         self.current_room = self.rooms[room]
-        print(self.current_room)
-        print(self.current_room.exits)
+        self.current_room_key = room
+        self.player_msg(self.current_room)
+        self.player_msg(self.current_room.exits)
         if Status.blind not in self.player.status:
-            print(self.current_room.item_list)
+            self.player_msg(self.current_room.item_list)
         if self.current_room.ending_room:
             self.finish("You have reached the exit, You can leave the manor now")
 
     async def game_loop(self):
         """Main loop of game."""
-        print(self.opening)
+        self.player_msg(self.opening)
         self.enter_room(self.start_room)
         while not self.running_event.is_set():
-            uinput = await ainput("Make your choice\n>  ", event=self.running_event)
+            self.flush(PROMPT)
+            uinput = await self.read_command()
+            if uinput is None:
+                break
             if not uinput:
                 continue
 
             try:
                 await self.parse_command(uinput)
             except CommandException as e:
-                print(e)
+                self.player_msg(e)
+        self.flush()
 
     def add_cog(self, cog):
         """Add a cog (collection of commands to the game."""
         # print("Registering cog: {.__class__.__name__}".format(cog))
-        print("Use the commad `help` to list available commands!")
-        for name, member in inspect.getmembers(cog):
+        self.player_msg("Use the commad `help` to list available commands!")
+        for name in sorted(dir(cog)):
+            member = getattr(cog, name)
             if isinstance(member, Command):
-                member.parent = cog
-                self.commands[name] = member
+                self.commands[name] = member.bind(cog)
+
+
+def load_world(path):
+    """Load a world from a JSON file, checking its fields and start room unless it was compiled by validate.py.
+
+    Raises validate.WorldError if the world has problems, other rooms raise it when they are made.
+    """
+    import json  # only needed once, keep it off the import path
+    from validate import check_world
+
+    with open(path) as fp:
+        return World.from_dict(check_world(json.load(fp)))
 
 
 if __name__ == '__main__':
 
-    with open("game.json") as fp:
-        gdata = json.load(fp)
+    from validate import WorldError
+
+    try:
+        world = load_world(sys.argv[1] if len(sys.argv) > 1 else "game.json")
+    except WorldError as e:
+        sys.exit(str(e))
 
-    loop = asyncio.get_event_loop()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
 
-    game = Game.from_dict(gdata)
+    game = Game(world, loop=loop)
     game.add_cog(BaseCommands(game))
 
-    loop.run_until_complete(game.game_loop())
+    # the game shows its first room before the rest of the world is loaded
+    try:
+        loop.run_until_complete(asyncio.gather(game.game_loop(), world.load()))
+    except WorldError as e:
+        sys.exit(str(e))
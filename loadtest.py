@@ -0,0 +1,329 @@
+"""Load test a world with simulated players and report latency, loop lag and memory.
+
+use: python loadtest.py [--clients N] [--duration S] [--protocol local|telnet|websocket]
+                        [--mix move=4,collect=2,use=1,list=1,help=1 | --script FILE]
+                        [--slo-p99 MS] [--slo-lag MS] [--slo-throughput N] [--slo-memory MB]
+                        [world.json]
+
+With any --slo option the exit status is 1 if an objective is missed, a command times out or a game crashes.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import resource
+import sys
+import time
+import traceback
+from collections import defaultdict
+
+from client import CLIENTS, LocalClient
+from game import load_world
+from server import serve
+
+DEFAULT_MIX = "move=4,collect=2,use=1,list=1,help=1"
+DIRECTIONS = ["north", "south", "east", "west"]
+
+_title_re = re.compile(r"^\*+(.+?)\*+$", re.MULTILINE)
+_exits_re = re.compile(r"exits: (.*)$", re.MULTILINE)
+_items_re = re.compile(r"^There are \d+ items: (.*)$", re.MULTILINE)
+_picked_re = re.compile(r"^You picked up a (.+)!$", re.MULTILINE)
+
+
+def memory_mb():
+    """Get the resident memory of this process in MB."""
+    try:
+        with open("/proc/self/statm") as fp:
+            return int(fp.read().split()[1]) * resource.getpagesize() / 2 ** 20
+    except OSError:  # not linux, fall back to the peak
+        scale = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def percentile(values, pct):
+    """Get a percentile of a sorted list."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def parse_items(line):
+    """Get the item names from the list of a room's items, each shown as `name | description`."""
+    parts = line.split(" | ")
+    names = [parts[0]] if len(parts) > 1 else []
+    for i in parts[1:-1]:  # a description, then the separator before the next name
+        names.append(re.split(r", | and ", i)[-1])
+    return [i for i in names if i]
+
+
+def parse_mix(mix):
+    """Parse `command=weight,...` into a dict."""
+    weights = {}
+    for i in mix.split(","):
+        name, _, weight = i.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+class Stats:
+    """Measurements collected during a load test."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)  # command -> seconds taken
+        self.errors = defaultdict(int)  # kind of error -> times it happened
+        self.crash = None  # the first exception a game ended with
+        self.lag = []  # seconds the event loop was late
+        self.memory = []  # (seconds since start, MB)
+        self.games = 0  # games played to the end or left
+
+    def crashed(self, exc):
+        """Count a game which ended with an exception, here or in the server."""
+        self.errors["game crashed"] += 1
+        if self.crash is None:
+            self.crash = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+
+    def report(self, duration):
+        commands = sum(map(len, self.latencies.values()))
+        lag = sorted(self.lag)
+        report = {
+            "duration": duration,
+            "commands": commands,
+            "throughput": commands / duration,
+            "games": self.games,
+            "errors": dict(self.errors),
+            "first_crash": self.crash,
+            "latency_ms": {},
+            "lag_ms": {"p50": percentile(lag, 50) * 1000, "p99": percentile(lag, 99) * 1000,
+                       "max": (lag[-1] if lag else 0) * 1000},
+            "memory_mb": self.memory,
+            "memory_growth_mb": self.memory[-1][1] - self.memory[0][1] if self.memory else 0
+        }
+        for name, values in sorted(self.latencies.items()):
+            values.sort()
+            report["latency_ms"][name] = {
+                "count": len(values),
+                "p50": percentile(values, 50) * 1000,
+                "p90": percentile(values, 90) * 1000,
+                "p99": percentile(values, 99) * 1000,
+                "max": values[-1] * 1000
+            }
+        return report
+
+
+class SimulatedPlayer:
+    """A simulated player, choosing commands from a script or at random from what it has seen."""
+
+    def __init__(self, rng, *, mix=None, script=None):
+        self.rng = rng
+        self.mix = mix
+        self.script = script
+        self.step = 0
+        self.exits = []
+        self.room_items = []  # names of items seen in the current room
+        self.items = []  # names of items picked up and not used
+
+    def seen(self, text):
+        """Update what the player knows from output of the game."""
+        if _title_re.search(text):
+            self.room_items = []  # entered a room, its items are not shown when blind
+        exits = _exits_re.findall(text)
+        if exits:
+            self.exits = [i for i in re.split(r", | and ", exits[-1]) if i]
+        items = _items_re.findall(text)
+        if items:
+            self.room_items = parse_items(items[-1])
+        for i in _picked_re.findall(text):
+            self.items.append(i)
+            if i in self.room_items:
+                self.room_items.remove(i)
+
+    def next_command(self):
+        """Get (command type, line) of the next command to send."""
+        if self.script is not None:
+            line = self.script[self.step % len(self.script)]
+            self.step += 1
+            return line.split(None, 1)[0], line
+
+        name = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        if name == "move":
+            return name, "move " + self.rng.choice(self.exits or DIRECTIONS)
+        if name == "collect":
+            return name, "collect " + (self.rng.choice(self.room_items) if self.room_items else "nothing")
+        if name == "use":
+            if not self.items:
+                return name, "use nothing"
+            return name, "use " + self.items.pop(self.rng.randrange(len(self.items)))
+        return name, name
+
+
+async def simulate(connect, stats, deadline, rng, *, mix, script, think, timeout):
+    """Play games until the deadline, starting a new game each time one ends."""
+    while time.perf_counter() < deadline:
+        client = await connect()
+        player = SimulatedPlayer(rng, mix=mix, script=script)
+        try:
+            player.seen(await asyncio.wait_for(client.read_prompt(), timeout))
+            while time.perf_counter() < deadline:
+                name, line = player.next_command()
+                start = time.perf_counter()
+                try:
+                    text = await asyncio.wait_for(client.command(line), timeout)
+                except asyncio.TimeoutError:
+                    stats.errors[f"{name} timed out"] += 1
+                    break
+                stats.latencies[name].append(time.perf_counter() - start)
+                player.seen(text)
+                if think:
+                    await asyncio.sleep(rng.uniform(0, 2 * think))
+        except EOFError:  # the game ended
+            pass
+        except OSError:
+            stats.errors["connection lost"] += 1
+        finally:
+            stats.games += 1
+            try:
+                await client.close()
+            except Exception as e:  # a local game crashed, count it rather than ending the run
+                stats.crashed(e)
+
+
+async def monitor(stats, start, interval, memory_interval):
+    """Measure how late the event loop wakes up, and memory use over time."""
+    loop = asyncio.get_event_loop()
+    next_memory = 0
+    while True:
+        before = loop.time()
+        await asyncio.sleep(interval)
+        stats.lag.append(max(0.0, loop.time() - before - interval))
+        elapsed = time.perf_counter() - start
+        if elapsed >= next_memory:
+            stats.memory.append((round(elapsed, 3), round(memory_mb(), 3)))
+            next_memory += memory_interval
+
+
+async def run(args):
+    world = load_world(args.world)
+    await world.load()
+    stats = Stats()
+
+    def handle_exception(loop, context):
+        # games served over the network crash in the server's connection handler
+        stats.crashed(context.get("exception") or Exception(context["message"]))
+
+    asyncio.get_event_loop().set_exception_handler(handle_exception)
+
+    if args.protocol == "local":
+        server = None
+
+        async def connect():
+            return await LocalClient.connect(world)
+    else:
+        server = await serve(world, port=0, protocol=args.protocol, compress=args.compress)
+        port = server.sockets[0].getsockname()[1]
+
+        async def connect():
+            return await CLIENTS[args.protocol].connect("127.0.0.1", port, compress=args.compress)
+
+    script = None
+    if args.script:
+        with open(args.script) as fp:
+            script = [i.strip() for i in fp if i.strip()]
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    deadline = start + args.duration
+    watcher = asyncio.ensure_future(monitor(stats, start, args.lag_interval, args.memory_interval))
+    await asyncio.gather(*(
+        simulate(connect, stats, deadline, random.Random(rng.random()), mix=parse_mix(args.mix),
+                 script=script, think=args.think / 1000, timeout=args.timeout)
+        for _ in range(args.clients)
+    ))
+    duration = time.perf_counter() - start
+    watcher.cancel()
+    stats.memory.append((round(duration, 3), round(memory_mb(), 3)))
+
+    if server is not None:
+        await asyncio.sleep(0.1)  # let the games see their clients leave
+        server.close()
+        await server.wait_closed()
+    return stats.report(duration)
+
+
+def check_slo(report, args):
+    """Check a report against the objectives given, get a list of failures."""
+    failures = []
+    if args.slo_p99 is not None:
+        for name, latency in report["latency_ms"].items():
+            if latency["p99"] > args.slo_p99:
+                failures.append(f"{name} p99 latency {latency['p99']:.2f}ms is over {args.slo_p99}ms")
+    if args.slo_lag is not None and report["lag_ms"]["p99"] > args.slo_lag:
+        failures.append(f"p99 event loop lag {report['lag_ms']['p99']:.2f}ms is over {args.slo_lag}ms")
+    if args.slo_throughput is not None and report["throughput"] < args.slo_throughput:
+        failures.append(f"throughput {report['throughput']:.1f}/s is under {args.slo_throughput}/s")
+    if args.slo_memory is not None and report["memory_growth_mb"] > args.slo_memory:
+        failures.append(f"memory grew {report['memory_growth_mb']:.1f}MB, over {args.slo_memory}MB")
+    if any(v is not None for v in (args.slo_p99, args.slo_lag, args.slo_throughput, args.slo_memory)):
+        for name, count in report["errors"].items():
+            failures.append(f"{name}: {count}")
+    return failures
+
+
+def print_report(report):
+    print(f"{report['commands']} commands in {report['duration']:.1f}s, {report['throughput']:.1f}/s,"
+          f" {report['games']} games")
+    print(f"{'command':<10} {'count':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, i in report["latency_ms"].items():
+        print(f"{name:<10} {i['count']:>8} {i['p50']:>8.2f} {i['p90']:>8.2f} {i['p99']:>8.2f} {i['max']:>8.2f}")
+    for name, count in report["errors"].items():
+        print(f"{name}: {count}")
+    if report["first_crash"]:
+        print(f"first crash: {report['first_crash']}")
+    lag = report["lag_ms"]
+    print(f"event loop lag: p50 {lag['p50']:.2f}ms, p99 {lag['p99']:.2f}ms, max {lag['max']:.2f}ms")
+    memory = report["memory_mb"]
+    if memory:
+        print(f"memory: {memory[0][1]:.1f}MB at start, {memory[-1][1]:.1f}MB at end,"
+              f" {report['memory_growth_mb']:+.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("world", nargs="?", default="game.json")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10, help="seconds to run for")
+    parser.add_argument("--protocol", choices=["local", *sorted(CLIENTS)], default="local",
+                        help="play games in this process or over loopback")
+    parser.add_argument("--no-compress", dest="compress", action="store_false")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weights of commands chosen at random")
+    parser.add_argument("--script", help="file of commands to play in order instead, one per line")
+    parser.add_argument("--think", type=float, default=0, help="mean ms to wait between commands")
+    parser.add_argument("--timeout", type=float, default=5, help="seconds before a command counts as failed")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--lag-interval", type=float, default=0.01, help="seconds between loop lag checks")
+    parser.add_argument("--memory-interval", type=float, default=1, help="seconds between memory samples")
+    parser.add_argument("--json", help="write the full report to this file")
+    parser.add_argument("--slo-p99", type=float, help="max p99 latency of any command in ms")
+    parser.add_argument("--slo-lag", type=float, help="max p99 event loop lag in ms")
+    parser.add_argument("--slo-throughput", type=float, help="min commands per second")
+    parser.add_argument("--slo-memory", type=float, help="max memory growth in MB")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    report = loop.run_until_complete(run(args))
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump(report, fp, indent=4)
+
+    failures = check_slo(report, args)
+    for i in failures:
+        print(f"FAIL: {i}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,382 @@
+"""Transports carrying the game over network connections."""
+import asyncio
+import base64
+import hashlib
+import struct
+import zlib
+
+from transport import Transport
+
+
+class StreamTransport(Transport):
+    """Base class for transports over asyncio streams."""
+
+    __slots__ = [
+        "reader",
+        "writer"
+    ]
+
+    def __init__(self, reader, writer):
+        super().__init__()
+        self.reader = reader
+        self.writer = writer
+
+    def send(self, data):
+        if not self.writer.is_closing():
+            self.sent_bytes += len(data)
+            self.writer.write(data)
+
+    async def close(self):
+        if not self.writer.is_closing():
+            self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:  # the player already went
+            pass
+
+
+IAC = 255
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250
+SE = 240
+COMPRESS2 = 86  # MCCP version 2
+
+
+class TelnetTransport(StreamTransport):
+    """Telnet transport, compressing output with MCCP2 if the client agrees to it.
+
+    After the client sends DO COMPRESS2 everything the server sends is one zlib stream.
+    """
+
+    __slots__ = [
+        "compress",
+        "compressor",
+        "received",
+        "partial"
+    ]
+
+    max_line = 1 << 16  # bytes a line or telnet command from the client may take
+
+    def __init__(self, reader, writer, *, compress=True):
+        super().__init__(reader, writer)
+        self.compress = compress
+        self.compressor = None
+        self.received = bytearray()  # text received, without telnet commands
+        self.partial = b""  # unfinished telnet command at the end of the last read
+        if compress:
+            self.send(bytes([IAC, WILL, COMPRESS2]))
+
+    def send(self, data):
+        if self.compressor is not None:
+            data = self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        super().send(data)
+
+    def negotiate(self, command, option):
+        """Answer an option negotiation from the client."""
+        if option == COMPRESS2 and command == DO and not self.compress:
+            self.send(bytes([IAC, WONT, option]))
+        elif option == COMPRESS2 and command == DO:
+            if self.compressor is None:
+                self.send(bytes([IAC, SB, COMPRESS2, IAC, SE]))
+                self.compressor = zlib.compressobj(9)
+        elif command == DO:
+            self.send(bytes([IAC, WONT, option]))
+        elif command == WILL:
+            self.send(bytes([IAC, DONT, option]))
+
+    def receive(self, data):
+        """Split received data into text and telnet commands."""
+        data = self.partial + data
+        self.partial = b""
+        i = 0
+        while i < len(data):
+            end = data.find(IAC, i)
+            if end == -1:
+                self.received += data[i:]
+                break
+            self.received += data[i:end]
+            i = end
+
+            if i + 1 >= len(data):
+                self.partial = data[i:]
+                break
+            command = data[i + 1]
+            if command == IAC:
+                self.received.append(IAC)
+                i += 2
+            elif command in (DO, DONT, WILL, WONT):
+                if i + 2 >= len(data):
+                    self.partial = data[i:]
+                    break
+                self.negotiate(command, data[i + 2])
+                i += 3
+            elif command == SB:
+                end = data.find(bytes([IAC, SE]), i)
+                if end == -1:
+                    self.partial = data[i:]
+                    break
+                i = end + 2  # no subnegotiations are supported, skip them
+            else:
+                i += 2
+
+    async def readline(self):
+        while True:
+            end = self.received.find(b"\n")
+            if end != -1:
+                line = bytes(self.received[:end + 1])
+                del self.received[:end + 1]
+                return line.decode(errors="replace")
+            if len(self.received) > self.max_line or len(self.partial) > self.max_line:
+                return None  # the client is flooding us, drop it
+            try:
+                data = await self.reader.read(4096)
+            except ConnectionError:
+                return None
+            if not data:
+                return None
+            self.receive(data)
+
+    def write(self, text):
+        data = text.replace("\n", "\r\n").encode().replace(b"\xff", b"\xff\xff")
+        self.raw_bytes += len(data)
+        self.send(data)
+
+    async def close(self):
+        if self.compressor is not None and not self.writer.is_closing():
+            self.writer.write(self.compressor.flush())  # end the compressed stream
+            self.compressor = None
+        await super().close()
+
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_DEFLATE_TAIL = b"\x00\x00\xff\xff"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_TOO_BIG = 1009
+
+
+class WebSocketError(Exception):
+    """A client broke the protocol, the connection is closed with code."""
+
+    def __init__(self, code, reason):
+        super().__init__(reason)
+        self.code = code
+
+
+def negotiate_deflate(offers):
+    """Pick a permessage-deflate offer from a Sec-WebSocket-Extensions header.
+
+    Returns the response header, window bits and if the context is reset per message,
+    or None if no offer can be accepted.
+    """
+    for offer in filter(None, (i.strip() for i in offers.split(","))):
+        name, *params = (i.strip() for i in offer.split(";"))
+        if name != "permessage-deflate":
+            continue
+
+        response = [name]
+        wbits = 15
+        no_context_takeover = False
+        for param in params:
+            key, _, value = param.partition("=")
+            key, value = key.strip(), value.strip().strip('"')
+            if key == "server_no_context_takeover" and not value:
+                no_context_takeover = True
+                response.append(key)
+            elif key == "server_max_window_bits" and value.isdigit() and 9 <= int(value) <= 15:
+                wbits = int(value)
+                response.append(param)
+            elif key not in ("client_no_context_takeover", "client_max_window_bits"):
+                break  # a parameter we do not understand, try the next offer
+        else:
+            return "; ".join(response), wbits, no_context_takeover
+
+
+class WebSocketTransport(StreamTransport):
+    """WebSocket transport, compressing messages with permessage-deflate if the client offers it.
+
+    Every write is sent as one text message, every text message received is one line.
+    """
+
+    __slots__ = [
+        "wbits",
+        "no_context_takeover",
+        "compressor",
+        "decompressor",
+        "close_sent"
+    ]
+
+    max_message = 1 << 16  # bytes a message from the client may take, after decompression
+
+    def __init__(self, reader, writer, *, deflate=None):
+        super().__init__(reader, writer)
+        self.close_sent = False
+        self.compressor = self.decompressor = None
+        if deflate is not None:
+            _, self.wbits, self.no_context_takeover = deflate
+            self.compressor = zlib.compressobj(9, zlib.DEFLATED, -self.wbits)
+            self.decompressor = zlib.decompressobj(-15)
+
+    @classmethod
+    async def accept(cls, reader, writer, *, compress=True):
+        """Complete the opening handshake of a connection."""
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return None
+
+        headers = {}
+        for line in request.decode("latin-1").split("\r\n")[1:]:
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        key = headers.get("sec-websocket-key")
+        if key is None or headers.get("upgrade", "").lower() != "websocket":
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            writer.close()
+            return None
+
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        response = [
+            "HTTP/1.1 101 Switching Protocols",
+            "Upgrade: websocket",
+            "Connection: Upgrade",
+            f"Sec-WebSocket-Accept: {accept}"
+        ]
+        deflate = None
+        if compress:
+            deflate = negotiate_deflate(headers.get("sec-websocket-extensions", ""))
+        if deflate is not None:
+            response.append(f"Sec-WebSocket-Extensions: {deflate[0]}")
+        writer.write(("\r\n".join(response) + "\r\n\r\n").encode())
+        return cls(reader, writer, deflate=deflate)
+
+    def send_frame(self, opcode, payload, rsv1=False):
+        if self.close_sent:
+            return
+        if opcode == OP_CLOSE:
+            self.close_sent = True
+        head = 0x80 | (0x40 if rsv1 else 0) | opcode
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", head, length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", head, 126, length)
+        else:
+            header = struct.pack("!BBQ", head, 127, length)
+        self.send(header + payload)
+
+    async def read_frame(self):
+        """Read a frame, get (fin, rsv1, opcode, payload)."""
+        first, second = await self.reader.readexactly(2)
+        if not second & 0x80:
+            raise WebSocketError(CLOSE_PROTOCOL_ERROR, "Frames from clients must be masked")
+        if first & 0x30:
+            raise WebSocketError(CLOSE_PROTOCOL_ERROR, "No extension using RSV2 or RSV3 was negotiated")
+        length = second & 0x7F
+        if length == 126:
+            length, = struct.unpack("!H", await self.reader.readexactly(2))
+        elif length == 127:
+            length, = struct.unpack("!Q", await self.reader.readexactly(8))
+        if first & 0x08 and (not first & 0x80 or length > 125):
+            raise WebSocketError(CLOSE_PROTOCOL_ERROR, "Control frames must not be fragmented or over 125 bytes")
+        if length > self.max_message:
+            raise WebSocketError(CLOSE_TOO_BIG, "Frame too big")
+        mask = await self.reader.readexactly(4)
+        payload = await self.reader.readexactly(length)
+        if length:
+            key = (mask * (length // 4 + 1))[:length]
+            payload = (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(length, "big")
+        return bool(first & 0x80), bool(first & 0x40), first & 0x0F, payload
+
+    async def readline(self):
+        try:
+            return await self.read_message()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        except WebSocketError as e:
+            self.send_frame(OP_CLOSE, struct.pack("!H", e.code) + str(e).encode())
+            return None
+
+    async def read_message(self):
+        """Read the next text or binary message, None if the client closes the connection.
+
+        Control frames may come between the frames of a message, raises WebSocketError
+        if the client breaks the protocol.
+        """
+        message = None  # payloads of the message being read, None until its first frame
+        size = 0
+        compressed = False
+        while True:
+            fin, rsv1, opcode, payload = await self.read_frame()
+
+            if opcode in (OP_CLOSE, OP_PING, OP_PONG) and rsv1:
+                raise WebSocketError(CLOSE_PROTOCOL_ERROR, "Control frames cannot be compressed")
+            if opcode == OP_CLOSE:
+                self.send_frame(OP_CLOSE, payload[:2])
+                return None
+            elif opcode == OP_PING:
+                self.send_frame(OP_PONG, payload)
+                continue
+            elif opcode == OP_PONG:
+                continue
+            elif opcode in (OP_TEXT, OP_BINARY):
+                if message is not None:
+                    raise WebSocketError(CLOSE_PROTOCOL_ERROR, "Expected the next frame of the message")
+                if rsv1 and self.decompressor is None:
+                    raise WebSocketError(CLOSE_PROTOCOL_ERROR, "Compression was not negotiated")
+                message = [payload]
+                size = len(payload)
+                compressed = rsv1
+            elif opcode == OP_CONTINUATION:
+                if message is None:
+                    raise WebSocketError(CLOSE_PROTOCOL_ERROR, "No message to continue")
+                if rsv1:
+                    raise WebSocketError(CLOSE_PROTOCOL_ERROR, "Only the first frame of a message sets RSV1")
+                message.append(payload)
+                size += len(payload)
+            else:
+                raise WebSocketError(CLOSE_PROTOCOL_ERROR, f"Unknown opcode {opcode}")
+            if size > self.max_message:
+                raise WebSocketError(CLOSE_TOO_BIG, "Message too big")
+
+            if fin:
+                data = b"".join(message)
+                if compressed:
+                    data = self.decompressor.decompress(data + WS_DEFLATE_TAIL, self.max_message + 1)
+                    if len(data) > self.max_message:
+                        raise WebSocketError(CLOSE_TOO_BIG, "Message too big")
+                return data.decode(errors="replace")
+
+    def write(self, text):
+        data = text.encode()
+        self.raw_bytes += len(data)
+        if self.compressor is None:
+            self.send_frame(OP_TEXT, data)
+            return
+
+        data = self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        if self.no_context_takeover:
+            self.compressor = zlib.compressobj(9, zlib.DEFLATED, -self.wbits)
+        self.send_frame(OP_TEXT, data[:-len(WS_DEFLATE_TAIL)], rsv1=True)
+
+    async def close(self):
+        self.send_frame(OP_CLOSE, struct.pack("!H", 1000))
+        await super().close()
+
+
+PROTOCOLS = {
+    "telnet": TelnetTransport,
+    "websocket": WebSocketTransport
+}
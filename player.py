@@ -46,7 +46,8 @@ class Player:
             self.loop.call_later(timeout, release)
 
     def hurt(self, *, damage):
-        self.notify("You took {} damage!".format(damage))
+        """Take damage from the players hp, ending the game if it drops below zero."""
+        self.notify("You took {} damage, you have {} hp left!".format(damage, self.hp - damage))
         self.hp -= damage
 
     @property
@@ -56,12 +57,12 @@ class Player:
     @hp.setter
     def hp(self, other):
         self._hp = other
-        self.status_display.set_stat("hp", self.hp)
         if self.hp < 0:
             self.game.finish("You died")
 
     def add_effect(self, *effects):
         for i in effects:
+            i = dict(i)  # effects belong to items shared between games, leave them untouched
             type_ = i.pop("type")
             if type_ == "blind":
                 self.blind(**i)
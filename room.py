@@ -34,12 +34,19 @@ class Room:
     def exits(self):
         return "There are {} exits: {}".format(len(self.rooms), and_comma_list(*self.rooms))
 
+    def copy(self):
+        """Copy a room, the copy gets its own list of items."""
+        return type(self)(name=self.name, description=self.description, rooms=self.rooms,
+                          items=list(self.items), global_rooms=self.global_rooms,
+                          ending_room=self.ending_room)
+
     def to_dict(self):
         return {
             "name": self.name,
             "rooms": self.rooms,
             "description": self.description,
-            "items": [(k, v.to_dict()) for k, v in self.items],
+            "items": [i.to_dict() for i in self.items],
+            "ending_room": self.ending_room
         }
 
     @classmethod
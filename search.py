@@ -0,0 +1,167 @@
+"""Inverted index for searching rooms and items by their text."""
+import bisect
+import re
+from collections import ChainMap, defaultdict
+
+_token_re = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Split text into lower case word tokens."""
+    return _token_re.findall(text.lower())
+
+
+def _deletes(token):
+    """Every variant of a token with a single character removed."""
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+class SearchIndex:
+    """Inverted index over room and item names and descriptions.
+
+    Rooms are indexed by their key and items by the item object itself. The
+    location of every item is tracked so queries stay correct as items move.
+    If loader is set it is called before the first query, to index anything
+    not added yet.
+    """
+
+    __slots__ = [
+        "postings",
+        "variants",
+        "locations",
+        "used",
+        "loader",
+        "_tokens"
+    ]
+
+    def __init__(self):
+        self.postings = defaultdict(set)  # token -> set of room keys and items
+        self.variants = defaultdict(set)  # token minus one letter -> set of tokens
+        self.locations = {}  # item -> room key, player holding it, or None once used
+        self.used = set()  # items used up, left out of results
+        self.loader = None  # callable adding whatever is not indexed yet
+        self._tokens = None  # sorted list of tokens for prefix lookup, built on demand
+
+    @classmethod
+    def from_rooms(cls, rooms):
+        """Build an index from a dict of room keys to rooms."""
+        index = cls()
+        for k, v in rooms.items():
+            index.add_room(k, v)
+        return index
+
+    def overlay(self):
+        """Create a view of this index which records item moves separately."""
+        return IndexOverlay(self)
+
+    def _add(self, doc, *texts):
+        for text in texts:
+            for token in tokenize(text):
+                if token not in self.postings:
+                    self._tokens = None
+                    for i in _deletes(token):
+                        self.variants[i].add(token)
+                self.postings[token].add(doc)
+
+    def add_room(self, key, room):
+        """Index a room and the items inside it."""
+        self._add(key, room.name, room.description)
+        for i in room.items:
+            self.add_item(i, key)
+
+    def add_item(self, item, location):
+        """Index an item at a location."""
+        self._add(item, item.name, item.description)
+        self.locations[item] = location
+
+    def move_item(self, item, location):
+        """Record that an item has moved to a room key or a player."""
+        self.locations[item] = location
+
+    def remove_item(self, item):
+        """Record that an item has been used up, it will no longer be found."""
+        self.locations[item] = None
+        self.used.add(item)
+
+    def _prefixed(self, term):
+        if self._tokens is None:
+            self._tokens = sorted(self.postings)
+        tokens = self._tokens
+        i = bisect.bisect_left(tokens, term)
+        while i < len(tokens) and tokens[i].startswith(term):
+            yield tokens[i]
+            i += 1
+
+    def _similar(self, term):
+        tokens = set(self.variants.get(term, ()))
+        for i in _deletes(term):
+            if i in self.postings:
+                tokens.add(i)
+            tokens.update(self.variants.get(i, ()))
+        return tokens
+
+    def _matches(self, term, fuzzy):
+        """Get the posting sets of every token a term matches, without copying them."""
+        tokens = list(self._prefixed(term))
+        if not tokens and fuzzy:
+            tokens = self._similar(term)
+        return [self.postings[i] for i in tokens]
+
+    def _find(self, terms, fuzzy):
+        """Get the documents matching every term, the result may be a posting set so must not be changed."""
+        if self.loader is not None:
+            self.loader()
+            self.loader = None
+        groups = [(sum(map(len, group)), group) for group in (self._matches(i, fuzzy) for i in terms)]
+        groups.sort(key=lambda i: i[0])
+        _, first = groups[0]
+        found = first[0] if len(first) == 1 else set().union(*first)
+        for size, group in groups[1:]:  # smallest first, so each step only looks at what is left
+            if not found:
+                break
+            if len(group) == 1:
+                found = found & group[0]
+            elif len(found) * len(group) < size:
+                found = {i for i in found if any(i in j for j in group)}
+            else:
+                found = {i for j in group for i in j if i in found}
+        return found
+
+    def search(self, query, *, fuzzy=True):
+        """Find room keys and items matching every word of a query.
+
+        Words match any token they are a prefix of, if nothing does and fuzzy is set
+        tokens one typo away are used instead.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return set()
+        return self._find(terms, fuzzy) - self.used
+
+    def rooms_containing(self, query, *, fuzzy=True):
+        """Find the keys of rooms holding an item matching a query."""
+        locations = (self.locations[i] for i in self.search(query, fuzzy=fuzzy) if not isinstance(i, str))
+        return {i for i in locations if isinstance(i, str)}
+
+
+class IndexOverlay(SearchIndex):
+    """View of a shared index for a single game.
+
+    Text is looked up in the shared index, while item moves are kept in the
+    overlay so they are only seen by the game that made them.
+    """
+
+    __slots__ = [
+        "base"
+    ]
+
+    def __init__(self, base):
+        self.base = base
+        self.locations = ChainMap({}, base.locations)
+        self.used = set()
+
+    def _add(self, doc, *texts):
+        self.base._add(doc, *texts)
+
+    def _find(self, terms, fuzzy):
+        return self.base._find(terms, fuzzy)
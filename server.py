@@ -0,0 +1,64 @@
+"""Serve games of a world to players over the network.
+
+use: python server.py [--protocol telnet|websocket] [--port N] [--no-compress] [world.json]
+"""
+import argparse
+import asyncio
+import sys
+
+from commands import BaseCommands
+from game import Game, load_world
+from network import PROTOCOLS
+from validate import WorldError
+
+
+async def serve(world, host="127.0.0.1", port=4000, *, protocol="telnet", compress=True):
+    """Start a server giving every connection its own game in world."""
+    transport_cls = PROTOCOLS[protocol]
+
+    async def play(reader, writer):
+        transport = await transport_cls.accept(reader, writer, compress=compress)
+        if transport is None:
+            return
+        game = Game(world, transport=transport)
+        game.add_cog(BaseCommands(game))
+        try:
+            await game.game_loop()
+        finally:
+            await transport.close()
+
+    return await asyncio.start_server(play, host, port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("world", nargs="?", default="game.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    parser.add_argument("--protocol", choices=sorted(PROTOCOLS), default="telnet")
+    parser.add_argument("--no-compress", dest="compress", action="store_false")
+    args = parser.parse_args()
+
+    try:
+        world = load_world(args.world)
+    except WorldError as e:
+        sys.exit(str(e))
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    server = loop.run_until_complete(serve(world, args.host, args.port,
+                                           protocol=args.protocol, compress=args.compress))
+    print("Serving {} on {}:{}".format(args.protocol, args.host, args.port))
+    try:
+        loop.run_until_complete(asyncio.gather(world.load(), server.serve_forever()))
+    except KeyboardInterrupt:
+        pass
+    except WorldError as e:
+        sys.exit(str(e))
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
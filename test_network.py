@@ -0,0 +1,216 @@
+"""Tests for the telnet and WebSocket transports."""
+import asyncio
+import struct
+import zlib
+
+import pytest
+
+from network import (CLOSE_PROTOCOL_ERROR, CLOSE_TOO_BIG, COMPRESS2, DO, DONT, IAC, OP_BINARY, OP_CLOSE,
+                     OP_CONTINUATION, OP_PING, OP_PONG, OP_TEXT, SB, SE, WILL, WONT, WS_DEFLATE_TAIL,
+                     TelnetTransport, WebSocketError, WebSocketTransport, negotiate_deflate)
+
+
+class Reader:
+    """Stand in for an asyncio StreamReader over fixed data."""
+
+    def __init__(self, data):
+        self.data = data
+
+    async def read(self, n):
+        data, self.data = self.data[:n], self.data[n:]
+        return data
+
+    async def readexactly(self, n):
+        if len(self.data) < n:
+            raise asyncio.IncompleteReadError(self.data, n)
+        return await self.read(n)
+
+
+class Writer:
+    """Stand in for an asyncio StreamWriter, keeping everything written."""
+
+    def __init__(self):
+        self.data = b""
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    def is_closing(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def telnet(*chunks, compress=True):
+    transport = TelnetTransport(None, Writer(), compress=compress)
+    for i in chunks:
+        transport.receive(i)
+    return transport
+
+
+def test_telnet_text():
+    assert telnet(b"move east\r\n").received == b"move east\r\n"
+
+
+def test_telnet_escaped_iac():
+    assert telnet(b"a\xff\xffb").received == b"a\xffb"
+    assert telnet(b"a\xff", b"\xffb").received == b"a\xffb"
+
+
+def test_telnet_negotiation_split_across_reads():
+    data = b"mo" + bytes([IAC, DO, COMPRESS2]) + b"ve\r\n"
+    transport = telnet(*(data[i:i + 1] for i in range(len(data))))
+    assert transport.received == b"move\r\n"
+    assert transport.compressor is not None
+    assert bytes([IAC, SB, COMPRESS2, IAC, SE]) in transport.writer.data
+
+
+def test_telnet_refuses_compression_when_off():
+    transport = telnet(bytes([IAC, DO, COMPRESS2]), compress=False)
+    assert transport.compressor is None
+    assert transport.writer.data == bytes([IAC, WONT, COMPRESS2])
+
+
+def test_telnet_refuses_other_options():
+    transport = telnet(bytes([IAC, WILL, 31]), compress=False)
+    assert transport.writer.data == bytes([IAC, DONT, 31])
+
+
+def test_telnet_subnegotiation_skipped():
+    assert telnet(b"x" + bytes([IAC, SB, 24, 1]), b"abc" + bytes([IAC, SE]) + b"y").received == b"xy"
+
+
+def test_telnet_readline():
+    transport = TelnetTransport(Reader(b"move east\r\nlist\r\n"), Writer(), compress=False)
+    assert run(transport.readline()) == "move east\r\n"
+    assert run(transport.readline()) == "list\r\n"
+    assert run(transport.readline()) is None
+
+
+@pytest.mark.parametrize("data", [
+    b"a" * (TelnetTransport.max_line + 4096),
+    bytes([IAC, SB, 24]) + b"a" * (TelnetTransport.max_line + 4096)
+])
+def test_telnet_readline_cap(data):
+    transport = TelnetTransport(Reader(data + b"\r\n"), Writer(), compress=False)
+    assert run(transport.readline()) is None
+
+
+@pytest.mark.parametrize("offers, expected", [
+    ("permessage-deflate; client_max_window_bits", ("permessage-deflate", 15, False)),
+    ("permessage-deflate; server_max_window_bits=10; server_no_context_takeover",
+     ("permessage-deflate; server_max_window_bits=10; server_no_context_takeover", 10, True)),
+    ("permessage-deflate; unknown, permessage-deflate", ("permessage-deflate", 15, False)),
+    ("permessage-deflate; server_max_window_bits=8", None),
+    ("x-webkit-deflate-frame", None),
+    ("", None)
+])
+def test_negotiate_deflate(offers, expected):
+    assert negotiate_deflate(offers) == expected
+
+
+def frame(opcode, payload=b"", *, fin=True, rsv1=False, mask=b"\x01\x02\x03\x04"):
+    """Make a frame as a client would send it."""
+    head = (0x80 if fin else 0) | (0x40 if rsv1 else 0) | opcode
+    masked = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", head, masked | length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", head, masked | 126, length)
+    else:
+        header = struct.pack("!BBQ", head, masked | 127, length)
+    if mask:
+        payload = mask + bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return header + payload
+
+
+def deflate(text):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    data = compressor.compress(text) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    return data[:-len(WS_DEFLATE_TAIL)]
+
+
+def websocket(*frames, deflate=None):
+    return WebSocketTransport(Reader(b"".join(frames)), Writer(), deflate=deflate)
+
+
+def test_websocket_message():
+    assert run(websocket(frame(OP_TEXT, b"move east")).read_message()) == "move east"
+
+
+def test_websocket_extended_lengths():
+    for length in (126, 1 << 16):
+        text = b"a" * length
+        assert run(websocket(frame(OP_TEXT, text)).read_message()) == text.decode()
+
+
+def test_websocket_fragmented_message():
+    transport = websocket(frame(OP_TEXT, b"mo", fin=False), frame(OP_CONTINUATION, b"ve ", fin=False),
+                          frame(OP_CONTINUATION, b"east"))
+    assert run(transport.read_message()) == "move east"
+
+
+def test_websocket_ping_inside_message():
+    transport = websocket(frame(OP_BINARY, b"move ", fin=False), frame(OP_PING, b"hi"),
+                          frame(OP_PONG, b"ho"), frame(OP_CONTINUATION, b"east"))
+    assert run(transport.read_message()) == "move east"
+    assert transport.writer.data == bytes([0x80 | OP_PONG, 2]) + b"hi"
+
+
+def test_websocket_deflate():
+    transport = websocket(frame(OP_TEXT, deflate(b"move east"), rsv1=True),
+                          deflate=negotiate_deflate("permessage-deflate"))
+    assert run(transport.read_message()) == "move east"
+
+
+def test_websocket_close():
+    transport = websocket(frame(OP_CLOSE, struct.pack("!H", 1000)))
+    assert run(transport.readline()) is None
+    run(transport.close())
+    assert transport.writer.data == bytes([0x80 | OP_CLOSE, 2]) + struct.pack("!H", 1000)
+
+
+@pytest.mark.parametrize("frames", [
+    [frame(OP_TEXT, b"move", mask=None)],
+    [frame(OP_TEXT, b"move", rsv1=True)],
+    [frame(OP_TEXT, b"mo", fin=False), frame(OP_TEXT, b"ve")],
+    [frame(OP_CONTINUATION, b"move")],
+    [frame(OP_TEXT, b"mo", fin=False), frame(OP_CONTINUATION, b"ve", rsv1=True)],
+    [frame(OP_PING, b"hi", fin=False)],
+    [frame(OP_PING, b"a" * 126)],
+    [frame(0x3)]
+])
+def test_websocket_protocol_errors(frames):
+    with pytest.raises(WebSocketError) as e:
+        run(websocket(*frames).read_message())
+    assert e.value.code == CLOSE_PROTOCOL_ERROR
+
+
+@pytest.mark.parametrize("frames, deflate", [
+    ([frame(OP_TEXT, b"a" * (WebSocketTransport.max_message + 1))], None),
+    ([frame(OP_TEXT, b"a" * WebSocketTransport.max_message, fin=False), frame(OP_CONTINUATION, b"a")], None),
+    ([frame(OP_TEXT, deflate(b"a" * (WebSocketTransport.max_message + 1)), rsv1=True)],
+     negotiate_deflate("permessage-deflate"))
+])
+def test_websocket_size_caps(frames, deflate):
+    with pytest.raises(WebSocketError) as e:
+        run(websocket(*frames, deflate=deflate).read_message())
+    assert e.value.code == CLOSE_TOO_BIG
+
+
+def test_websocket_error_closes_once():
+    transport = websocket(frame(OP_CONTINUATION, b"move"))
+    assert run(transport.readline()) is None
+    run(transport.close())
+    assert transport.writer.data.count(bytes([0x80 | OP_CLOSE])) == 1
+    assert transport.writer.data[2:4] == struct.pack("!H", CLOSE_PROTOCOL_ERROR)
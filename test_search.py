@@ -0,0 +1,82 @@
+"""Tests for the search index."""
+import json
+import os
+
+from item import Item
+from room import Room
+from search import SearchIndex
+from world import World
+
+
+def make_index():
+    potion = Item("green potion", "It looks like it tastes nice.")
+    chocolate = Item("chocolate", "A bar of dark chocolate.")
+    rooms = {
+        "hall": Room(name="Great hall", description="A hall with dusty corners.", items=[potion]),
+        "kitchen": Room(name="Kitchen", description="Pots hang over a dusty stove.", items=[chocolate])
+    }
+    return SearchIndex.from_rooms(rooms), potion, chocolate
+
+
+def test_prefix():
+    index, potion, chocolate = make_index()
+    assert index.search("choc") == {chocolate}
+    assert index.search("kit") == {"kitchen"}
+
+
+def test_every_term_must_match():
+    index, potion, chocolate = make_index()
+    assert index.search("dusty") == {"hall", "kitchen"}
+    assert index.search("dusty stove") == {"kitchen"}
+    assert index.search("dusty potion") == set()
+
+
+def test_fuzzy():
+    index, potion, chocolate = make_index()
+    assert index.search("chocolste") == {chocolate}
+    assert index.search("chocolste", fuzzy=False) == set()
+    assert index.search("potoin") == {potion}  # swapped letters count as one typo
+    assert index.search("pxtixn") == set()
+
+
+def test_empty_query():
+    index, potion, chocolate = make_index()
+    assert index.search("") == set()
+    assert index.search("!?") == set()
+
+
+def test_results_do_not_change_postings():
+    index, potion, chocolate = make_index()
+    index.search("dusty").add("cellar")
+    assert index.search("dusty") == {"hall", "kitchen"}
+
+
+def test_items_move_and_get_used():
+    index, potion, chocolate = make_index()
+    assert index.rooms_containing("potion") == {"hall"}
+    index.move_item(potion, "kitchen")
+    assert index.rooms_containing("potion") == {"kitchen"}
+    index.move_item(potion, object())  # a player holding it
+    assert index.rooms_containing("potion") == set()
+    index.remove_item(chocolate)
+    assert index.search("chocolate") == set()
+
+
+def test_overlays_keep_their_own_moves():
+    index, potion, chocolate = make_index()
+    first, second = index.overlay(), index.overlay()
+    first.move_item(potion, "kitchen")
+    first.remove_item(chocolate)
+    assert first.rooms_containing("potion") == {"kitchen"}
+    assert first.search("chocolate") == set()
+    assert second.rooms_containing("potion") == {"hall"}
+    assert second.search("chocolate") == {chocolate}
+    assert index.rooms_containing("potion") == {"hall"}
+
+
+def test_queries_load_lazy_rooms_first():
+    with open(os.path.join(os.path.dirname(__file__), "game.json")) as fp:
+        world = World.from_dict(json.load(fp))
+    assert world.rooms.pending
+    assert world.index.rooms_containing("chocolate")
+    assert not world.rooms.pending
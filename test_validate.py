@@ -0,0 +1,100 @@
+"""Tests for validating and compiling worlds."""
+import copy
+import json
+import os
+
+import pytest
+
+from validate import WorldError, check_world, compile_world
+from world import World
+
+with open(os.path.join(os.path.dirname(__file__), "game.json")) as fp:
+    GAME = json.load(fp)
+
+
+def make_world(rooms=4):
+    """A ring of rooms, each leading to the next."""
+    return {
+        "rooms": {f"r{n}": {
+            "name": f"Room {n}",
+            "description": "A room.",
+            "rooms": {"east": f"r{(n + 1) % rooms}"},
+            "items": [{"name": "potion", "description": "A potion.", "effects": [{"type": "hurt", "damage": 5}]}]
+        } for n in range(rooms)},
+        "opening": "Welcome",
+        "start_room": "r0"
+    }
+
+
+def test_game_compiles():
+    world, problems = compile_world(GAME, workers=1)
+    assert problems == []
+    assert world["compiled"] is True
+    assert set(world["rooms"]) == set(GAME["rooms"])
+    assert check_world(world) is world
+
+
+def test_defaults_filled_in():
+    world, problems = compile_world(make_world(), workers=1)
+    assert problems == []
+    assert world["basehp"] == 100
+    assert world["rooms"]["r0"]["ending_room"] is False
+
+
+def test_process_pool_matches():
+    dic = make_world(10)
+    dic["rooms"]["r3"]["items"][0]["effects"] = [{"type": "hurt"}]
+    assert compile_world(dic, workers=2, chunk_size=3) == compile_world(dic, workers=1)
+
+
+def test_exits_checked_across_chunks():
+    dic = make_world(6)
+    assert compile_world(dic, workers=1, chunk_size=2)[1] == []
+    dic["rooms"]["r5"]["rooms"]["up"] = "attic"
+    assert compile_world(dic, workers=1, chunk_size=2)[1] == ["room 'r5': exit up leads to unknown room 'attic'"]
+
+
+@pytest.mark.parametrize("change, problem", [
+    (lambda d: d.update(start_room=["r0"]), "world: `start_room` ['r0'] is not a room"),
+    (lambda d: d.update(start_room="r9"), "world: `start_room` 'r9' is not a room"),
+    (lambda d: d.update(basehp="lots"), "world: `basehp` should be a number, got 'lots'"),
+    (lambda d: d.update(colour="red"), "world: unknown field `colour`"),
+    (lambda d: d["rooms"]["r1"].pop("name"), "room 'r1': `name` should be a string, got None"),
+    (lambda d: d["rooms"]["r1"].update(ending_room=1), "room 'r1': `ending_room` should be true or false, got 1"),
+    (lambda d: d["rooms"]["r1"]["items"][0]["effects"][0].update(type="fly"),
+     "room 'r1' item 0 effect 0: unknown effect type 'fly'"),
+    (lambda d: d["rooms"]["r1"]["items"][0]["effects"][0].pop("damage"),
+     "room 'r1' item 0 effect 0: hurt effect is missing `damage`"),
+    (lambda d: d["rooms"]["r1"]["items"][0]["effects"][0].update(damage=True),
+     "room 'r1' item 0 effect 0: `damage` should be a number, got True")
+])
+def test_problems(change, problem):
+    dic = make_world()
+    change(dic)
+    assert compile_world(dic, workers=1)[1] == [problem]
+
+
+def test_check_world_only_checks_start_room():
+    dic = make_world()
+    dic["rooms"]["r2"]["rooms"]["up"] = "attic"
+    assert check_world(dic) is dic
+    dic["rooms"]["r0"]["rooms"]["up"] = "attic"
+    with pytest.raises(WorldError) as e:
+        check_world(dic)
+    assert e.value.problems == ["room 'r0': exit up leads to unknown room 'attic'"]
+
+
+def test_rooms_checked_when_made():
+    dic = make_world()
+    dic["rooms"]["r2"]["items"][0]["effects"][0]["type"] = "fly"
+    world = World.from_dict(check_world(copy.deepcopy(dic)))
+    assert world.rooms["r1"].name == "Room 1"
+    with pytest.raises(WorldError):
+        world.rooms["r2"]
+
+
+def test_compiled_rooms_not_checked():
+    dic = make_world()
+    dic["rooms"]["r2"]["rooms"]["up"] = "attic"
+    dic["compiled"] = True
+    assert World.from_dict(dic).rooms["r2"].rooms["up"] == "attic"
@@ -0,0 +1,76 @@
+"""Transports carrying text between players and the game loop."""
+import asyncio
+import sys
+
+
+class Transport:
+    """Base class for a connection to a player.
+
+    Counts the bytes of text written and the bytes actually sent after compression.
+    """
+
+    __slots__ = [
+        "raw_bytes",
+        "sent_bytes"
+    ]
+
+    def __init__(self):
+        self.raw_bytes = 0
+        self.sent_bytes = 0
+
+    @classmethod
+    async def accept(cls, reader, writer, *, compress=True):
+        """Create a transport for a new connection, or None if it is refused."""
+        return cls(reader, writer, compress=compress)
+
+    async def readline(self):
+        """Get the next line from the player, None once they have gone."""
+        raise NotImplementedError
+
+    def write(self, text):
+        """Send text to the player."""
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class StdioTransport(Transport):
+    """Transport for a player on stdin and stdout."""
+
+    __slots__ = []
+
+    async def readline(self):
+        line = await asyncio.get_event_loop().run_in_executor(None, sys.stdin.readline)
+        return line or None  # an empty string is the end of input
+
+    def write(self, text):
+        self.raw_bytes += len(text)
+        self.sent_bytes += len(text)
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+
+class QueueTransport(Transport):
+    """Transport for a player in the same process, lines and writes are passed through queues."""
+
+    __slots__ = [
+        "lines",
+        "writes"
+    ]
+
+    def __init__(self):
+        super().__init__()
+        self.lines = asyncio.Queue()  # lines from the player, None once they leave
+        self.writes = asyncio.Queue()  # text written to the player, None once closed
+
+    async def readline(self):
+        return await self.lines.get()
+
+    def write(self, text):
+        self.raw_bytes += len(text)
+        self.sent_bytes += len(text)
+        self.writes.put_nowait(text)
+
+    async def close(self):
+        self.writes.put_nowait(None)
@@ -0,0 +1,276 @@
+"""Validate and compile worlds, checking chunks of rooms in a process pool.
+
+use: python validate.py [--workers N] [--chunk-size N] [-o compiled.json] world.json
+"""
+import os
+import sys
+from itertools import islice
+
+EFFECTS = {  # effect type -> arguments it takes, matching Player.add_effect
+    "blind": {"timeout"},
+    "slow": {"timeout"},
+    "hurt": {"damage"}
+}
+
+
+class WorldError(Exception):
+    """A world has problems which would break it during play."""
+
+    def __init__(self, problems):
+        super().__init__("The world has {} problems:\n{}".format(len(problems), "\n".join(problems)))
+        self.problems = problems
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _text(dic, key, where, problems):
+    value = dic.get(key)
+    if not isinstance(value, str):
+        problems.append(f"{where}: `{key}` should be a string, got {value!r}")
+    return value
+
+
+def check_effect(effect, where, problems):
+    """Validate an effect of an item, get the effect or None if it cannot be used."""
+    if not isinstance(effect, dict):
+        problems.append(f"{where}: should be an object, got {effect!r}")
+        return None
+    type_ = effect.get("type")
+    if type_ not in EFFECTS:
+        problems.append(f"{where}: unknown effect type {type_!r}")
+        return None
+
+    args = set(effect) - {"type"}
+    ok = True
+    for i in sorted(EFFECTS[type_] - args):
+        problems.append(f"{where}: {type_} effect is missing `{i}`")
+        ok = False
+    for i in sorted(args - EFFECTS[type_]):
+        problems.append(f"{where}: {type_} effect does not take `{i}`")
+        ok = False
+    for i in sorted(args & EFFECTS[type_]):
+        if not _is_number(effect[i]):
+            problems.append(f"{where}: `{i}` should be a number, got {effect[i]!r}")
+            ok = False
+    return dict(effect) if ok else None
+
+
+def check_item(item, where, problems):
+    """Validate an item, get it with defaults filled in or None if it cannot be used."""
+    if not isinstance(item, dict):
+        problems.append(f"{where}: should be an object, got {item!r}")
+        return None
+    found = len(problems)
+    name = _text(item, "name", where, problems)
+    description = _text(item, "description", where, problems)
+    for i in sorted(set(item) - {"name", "description", "effects"}):
+        problems.append(f"{where}: unknown field `{i}`")
+
+    effects = item.get("effects", [])
+    if not isinstance(effects, list):
+        problems.append(f"{where}: `effects` should be a list, got {effects!r}")
+        effects = []
+    effects = [check_effect(e, f"{where} effect {n}", problems) for n, e in enumerate(effects)]
+    if len(problems) > found:
+        return None
+    return {"name": name, "description": description, "effects": effects}
+
+
+def check_room(key, room, problems):
+    """Validate a room, get it with defaults filled in or None if it cannot be used.
+
+    Exits are only checked to be strings, the rooms they lead to are checked by
+    `check_exits` once every chunk has been checked.
+    """
+    where = f"room {key!r}"
+    if not isinstance(room, dict):
+        problems.append(f"{where}: should be an object, got {room!r}")
+        return None
+    found = len(problems)
+    name = _text(room, "name", where, problems)
+    description = _text(room, "description", where, problems)
+    for i in sorted(set(room) - {"name", "description", "rooms", "items", "ending_room"}):
+        problems.append(f"{where}: unknown field `{i}`")
+
+    exits = room.get("rooms", {})
+    if not isinstance(exits, dict) or not all(isinstance(i, str) for i in exits.values()):
+        problems.append(f"{where}: `rooms` should map directions to room keys, got {exits!r}")
+    items = room.get("items", [])
+    if not isinstance(items, list):
+        problems.append(f"{where}: `items` should be a list, got {items!r}")
+        items = []
+    items = [check_item(item, f"{where} item {n}", problems) for n, item in enumerate(items)]
+    ending_room = room.get("ending_room", False)
+    if not isinstance(ending_room, bool):
+        problems.append(f"{where}: `ending_room` should be true or false, got {ending_room!r}")
+
+    if len(problems) > found:
+        return None
+    return {
+        "name": name,
+        "description": description,
+        "rooms": dict(exits),
+        "items": items,
+        "ending_room": ending_room
+    }
+
+
+def check_chunk(rooms):
+    """Validate a dict of rooms, get (rooms that can be used, problems)."""
+    problems = []
+    checked = {}
+    for key, room in rooms.items():
+        room = check_room(key, room, problems)
+        if room is not None:
+            checked[key] = room
+    return checked, problems
+
+
+def check_exits(rooms, problems, known=None):
+    """Check the exits of every room lead to a room that exists, in known if given or else in rooms."""
+    if known is None:
+        known = rooms
+    for key, room in rooms.items():
+        exits = room.get("rooms", {}) if isinstance(room, dict) else {}
+        if not isinstance(exits, dict):
+            continue  # already reported by check_room
+        for direction, target in exits.items():
+            if isinstance(target, str) and target not in known:
+                problems.append(f"room {key!r}: exit {direction} leads to unknown room {target!r}")
+
+
+def compile_room(key, room, rooms):
+    """Validate a single room as it is made, get it with defaults filled in.
+
+    Exits are checked against rooms. Raises WorldError if the room has problems.
+    """
+    problems = []
+    checked = check_room(key, room, problems)
+    check_exits({key: room}, problems, known=rooms)
+    if problems:
+        raise WorldError(problems)
+    return checked
+
+
+def check_fields(dic, rooms, problems):
+    """Validate the fields of a world other than its rooms, get (opening, start room, basehp)."""
+    opening = _text(dic, "opening", "world", problems)
+    start_room = dic.get("start_room")
+    if not isinstance(start_room, str) or start_room not in rooms:
+        problems.append(f"world: `start_room` {start_room!r} is not a room")
+    basehp = dic.get("basehp", 100)
+    if not _is_number(basehp):
+        problems.append(f"world: `basehp` should be a number, got {basehp!r}")
+    for i in sorted(set(dic) - {"rooms", "opening", "start_room", "basehp", "compiled"}):
+        problems.append(f"world: unknown field `{i}`")
+    return opening, start_room, basehp
+
+
+def _rooms(dic, problems):
+    rooms = dic.get("rooms", {})
+    if not isinstance(rooms, dict):
+        problems.append(f"world: `rooms` should be an object, got {rooms!r}")
+        rooms = {}
+    return rooms
+
+
+def chunks(dic, size):
+    """Split a dict into dicts of at most size items."""
+    it = iter(dic.items())
+    chunk = dict(islice(it, size))
+    while chunk:
+        yield chunk
+        chunk = dict(islice(it, size))
+
+
+def compile_world(dic, *, workers=None, chunk_size=1000):
+    """Validate a world, get (the world with defaults filled in, problems).
+
+    Rooms are checked in chunks by a pool of worker processes, the world can only
+    be loaded safely if there are no problems. The compiled world is marked so it
+    is not checked again when it is loaded.
+    """
+    problems = []
+    rooms = _rooms(dic, problems)
+
+    def merge(results):
+        for checked, found in results:
+            compiled.update(checked)
+            problems.extend(found)
+
+    compiled = {}
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1 or len(rooms) <= chunk_size:
+        merge(map(check_chunk, chunks(rooms, chunk_size)))  # not worth starting processes
+    else:
+        from concurrent.futures import ProcessPoolExecutor  # slow to import, only needed for big worlds
+
+        with ProcessPoolExecutor(workers) as pool:
+            merge(pool.map(check_chunk, chunks(rooms, chunk_size)))
+
+    # exits can lead to rooms in any chunk, so they are checked after merging
+    check_exits(rooms, problems)
+
+    opening, start_room, basehp = check_fields(dic, rooms, problems)
+
+    world = {
+        "rooms": compiled,
+        "basehp": basehp,
+        "opening": opening,
+        "start_room": start_room,
+        "compiled": True
+    }
+    return world, problems
+
+
+def check_world(dic):
+    """Check the fields of a world and its start room before it is loaded.
+
+    This is quick enough to do before the first prompt, the other rooms are
+    checked with `compile_room` as they are made unless the world was compiled.
+    Raises WorldError if the world has problems.
+    """
+    if dic.get("compiled"):
+        return dic
+    problems = []
+    rooms = _rooms(dic, problems)
+    _, start_room, _ = check_fields(dic, rooms, problems)
+    if not problems:
+        check_room(start_room, rooms[start_room], problems)
+        check_exits({start_room: rooms[start_room]}, problems, known=rooms)
+    if problems:
+        raise WorldError(problems)
+    return dic
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("world")
+    parser.add_argument("-o", "--output", help="write the compiled world here if it has no problems")
+    parser.add_argument("--workers", type=int, help="number of worker processes, defaults to the number of cores")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="number of rooms checked at a time")
+    args = parser.parse_args()
+
+    with open(args.world) as fp:
+        dic = json.load(fp)
+
+    world, problems = compile_world(dic, workers=args.workers, chunk_size=args.chunk_size)
+    for i in problems:
+        print(i)
+    print("{} rooms, {} problems".format(len(dic.get("rooms", {})), len(problems)))
+    if problems:
+        sys.exit(1)
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(world, fp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Module holding the World class, the content shared by games."""
+import asyncio
+from itertools import islice
+
+from room import Room
+from search import SearchIndex
+from validate import compile_room
+
+
+class RoomMap(dict):
+    """Dict of room hashes to rooms, which are made from their JSON when first used.
+
+    Unless check is false rooms are validated as they are made, raising
+    validate.WorldError if one has problems.
+    """
+
+    __slots__ = [
+        "pending",
+        "index",
+        "check"
+    ]
+
+    def __init__(self, pending, index, *, check=True):
+        super().__init__()
+        self.pending = pending  # dict of hashes to JSON of rooms not made yet
+        self.index = index
+        self.index.loader = self.load  # queries would miss rooms not made yet
+        self.check = check
+
+    def __missing__(self, key):
+        dic = self.pending[key]
+        if self.check:
+            dic = compile_room(key, dic, self)
+        del self.pending[key]
+        room = Room.from_dict(dic)
+        room.global_rooms = self
+        self[key] = room
+        self.index.add_room(key, room)
+        return room
+
+    def __contains__(self, key):
+        return super().__contains__(key) or key in self.pending
+
+    def load(self, count=None):
+        """Make up to count pending rooms, or all of them."""
+        for k in list(islice(self.pending, count)):
+            self[k]
+
+
+class World:
+    """Class holding the rooms and settings of a world.
+
+    A world is loaded once and never changed, any number of games can be
+    played in it at the same time with each game keeping only its own changes.
+    Rooms are made from JSON on first use, `load` makes the rest in the background.
+    """
+
+    __slots__ = [
+        "rooms",
+        "opening",
+        "start_room",
+        "basehp",
+        "index"
+    ]
+
+    def __init__(self, *, rooms, opening, start_room, basehp=100, index=None):
+        self.rooms = rooms  # dict of hashes to room objects
+        self.opening = opening
+        self.start_room = start_room
+        self.basehp = basehp
+        self.index = SearchIndex.from_rooms(rooms) if index is None else index
+
+    @classmethod
+    def from_dict(cls, dic):
+        """Helper function to generate a world from a JSON file."""
+        dic = dict(dic)
+        check = not dic.pop("compiled", False)  # compiled worlds were checked by validate.py
+        index = SearchIndex()
+        rooms = RoomMap(dict(dic.pop("rooms", {})), index, check=check)
+        return cls(rooms=rooms, index=index, **dic)
+
+    async def load(self, chunk_size=500):
+        """Make every room not used yet, letting other tasks run between chunks."""
+        while getattr(self.rooms, "pending", None):
+            self.rooms.load(chunk_size)
+            await asyncio.sleep(0)
+
+    def load_now(self):
+        """Make every room not used yet."""
+        if isinstance(self.rooms, RoomMap):
+            self.rooms.load()
+
+    def to_dict(self):
+        self.load_now()
+        return {
+            "rooms": {k: v.to_dict() for k, v in self.rooms.items()},
+            "basehp": self.basehp,
+            "opening": self.opening,
+            "start_room": self.start_room
+        }